@@ -1,34 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import PlainTextResponse
-from ..services.search import SearchService, get_search_service
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from ..services.search import SearchService
 
 
 router = APIRouter()
 
-@router.get("/search", response_class=PlainTextResponse)
+def get_search_service(request: Request) -> SearchService:
+    """
+    Return the app-lifetime SearchService created in the lifespan handler.
+    """
+    return request.app.state.search_service
+
+@router.get("/search")
 async def search_text(
     q: str = Query(..., description="Text to search for"),
     search_service: SearchService = Depends(get_search_service)
 ):
     """
     Search for text in files stored in dropbox cloud storage.
-            
+
     Returns:
-        str: A newline-separated list of file paths that match the search query
-        
+        StreamingResponse: matching file paths streamed one per line, so
+        time to first byte and peak memory stay flat for large result sets
+
     Raises:
         HTTPException: If the search operation fails
     """
     try:
-        response = await search_service.search_files(
-            query=q
-        )
-        return "\n".join(response.full_paths)
-        
+        await search_service.refresh_from_storage()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Search failed: {str(e)}"
         )
-    finally:
-        await search_service.close()
\ No newline at end of file
+
+    async def path_stream():
+        async for path in search_service.iter_paths(q):
+            yield path.encode() + b"\n"
+
+    return StreamingResponse(path_stream(), media_type="text/plain")
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 from pathlib import Path
 import os
 import sys
@@ -22,14 +22,27 @@ class Settings(BaseSettings):
     ELASTICSEARCH_PASSWORD: Optional[str] = None
     ELASTICSEARCH_VERIFY_CERTS: bool = False
     ELASTICSEARCH_INDEX: str = "cloud_search"
+    ELASTICSEARCH_SHARDS: int = 1
+    # Bulk indexing: keep chunk_size <= max_chunk_bytes / avg doc size
+    # (OCR/PDF text averages ~4-50KB, so 1000 docs stays under 10MB)
+    ELASTICSEARCH_CHUNK_SIZE: int = 1000
+    ELASTICSEARCH_MAX_CHUNK_BYTES: int = 10 * 1024 * 1024
+    ELASTICSEARCH_THREAD_COUNT: int = 8
+    # "async" batches translog fsyncs; set "request" to fsync per request
+    ELASTICSEARCH_TRANSLOG_DURABILITY: str = "async"
+    # Steady-state refresh cadence; bulk loads suspend it and restore this
+    ELASTICSEARCH_REFRESH_INTERVAL: str = "30s"
     
     # OCR settings
     TESSERACT_CMD: str = "/usr/bin/tesseract"
     OCR_LANGUAGE: str = "eng"  
+    OCR_CACHE_PATH: Path = Path("/app/data/ocr_cache.db")
     
     # Search settings
     MAX_FILE_SIZE: int = 600000  
-    SUPPORTED_FORMATS: List[str] = SUPPORTED_EXTENSIONS
+    # PDF extraction backend: "fitz" (PyMuPDF) or "pdfium" (pypdfium2)
+    PDF_BACKEND: str = "fitz"
+    SUPPORTED_FORMATS: FrozenSet[str] = SUPPORTED_EXTENSIONS
     USE_CACHE: bool = True  
     
     # API settings
@@ -7,7 +7,9 @@ class FileExtension(str, Enum):
     CSV = '.csv'
     PNG = '.png'
 
-SUPPORTED_EXTENSIONS = [ext.value.lstrip('.') for ext in FileExtension] 
+# Dotted form, matching what os.path.splitext returns, so consumers can
+# test membership without a per-file lstrip
+SUPPORTED_EXTENSIONS: frozenset = frozenset(ext.value for ext in FileExtension)
 
 
 API = 'api'
@@ -1,27 +1,50 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.responses import JSONResponse
 import logging
 import uvicorn
 from .core.constants import API , V1
 from .core.config import get_settings
+from .services.search import get_search_service
 from .api.routes import router
 
+settings = get_settings()
+
 # Configure logging
 logging.basicConfig(
-    level=logging.DEBUG if get_settings().DEBUG else logging.INFO,
+    level=logging.DEBUG if settings.DEBUG else logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the shared SearchService once at startup and close its
+    connections only on shutdown, so connection pools live for the
+    whole app lifetime instead of being rebuilt per request.
+    """
+    search_service = get_search_service()
+    app.state.search_service = search_service
+    try:
+        await search_service.ensure_index_exists()
+    except Exception as e:
+        logger.warning(f"Could not verify search index at startup: {e}")
+    logger.info("SearchService initialized for app lifetime")
+    yield
+    await search_service.close()
+    logger.info("SearchService connections closed on shutdown")
+
+
 app = FastAPI(
     title="Cloud Search Service",
     description="A service for searching through cloud storage files",
-    version=get_settings().API_VERSION,
-    debug=get_settings().DEBUG
+    version=settings.API_VERSION,
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
-settings = get_settings()
-
 app.include_router(router, prefix="/{}/{}".format(API,V1))
 
 
@@ -30,6 +53,6 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=get_settings().DEBUG,
-        log_level="debug" if get_settings().DEBUG else "info"
-    ) 
+        reload=settings.DEBUG,
+        log_level="debug" if settings.DEBUG else "info"
+    )
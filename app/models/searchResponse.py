@@ -1,3 +1,5 @@
+from functools import cached_property
+from operator import itemgetter
 from typing import List, Dict, Any
 from pydantic import BaseModel, Field
 
@@ -16,9 +18,12 @@ class Full_path_SearchResponse(BaseSearchResponse):
     results: List[Dict[str, Any]] = Field(default_factory=list)
     total_hits: int = Field()
 
-    @property
+    @cached_property
     def full_paths(self) -> List[str]:
         """
         Return the full paths of the results.
+
+        Computed once per response instance via a C-level map/itemgetter
+        pass and cached for repeated serialization.
         """
-        return [result["full_path"] for result in self.results]
\ No newline at end of file
+        return list(map(itemgetter("full_path"), self.results))
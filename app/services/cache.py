@@ -0,0 +1,81 @@
+"""
+Persistent text cache for expensive extraction results.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Dropbox content hashes are computed over 4MB blocks
+DROPBOX_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class TextCache:
+    """
+    Minimal key/text cache backed by SQLite.
+
+    Keeps expensive extraction output (OCR, PDF parsing) across crawls
+    without holding large text blobs in the JSON catalog.
+    """
+
+    def __init__(self, path: str, table: str = "cache"):
+        """
+        Open (or create) the cache database at the given path.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._table = table
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, text TEXT)"
+        )
+        self._conn.commit()
+        logger.info(f"Text cache opened at {path} (table: {table})")
+
+    def get(self, key: str):
+        """
+        Return the cached text for key, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT text FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, text: str):
+        """
+        Store text under key, replacing any previous value.
+        """
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, text) VALUES (?, ?)",
+                (key, text)
+            )
+            self._conn.commit()
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def dropbox_content_hash(file_path: str) -> str:
+    """
+    Compute the Dropbox content_hash of a local file: the SHA-256 of the
+    concatenated per-4MB-block SHA-256 digests. Matches the hash Dropbox
+    reports in FileMetadata, so local files can be compared against
+    cloud entries without a download.
+    """
+    overall = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            block = f.read(DROPBOX_HASH_BLOCK_SIZE)
+            if not block:
+                break
+            overall.update(hashlib.sha256(block).digest())
+    return overall.hexdigest()
@@ -1,14 +1,20 @@
 import os
 from typing import Dict, Any
-import json
+import asyncio
 import logging
+import orjson
 from datetime import datetime
+from elasticsearch.helpers import async_bulk
+from ..services import storage
 from ..services.storage import get_storage_service
 from ..core.config import get_settings
 from .textsearch import ElasticSearchService
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for concurrent cloud fetches on the direct-index path
+MAX_CONCURRENT_FETCHES = 16
+
 class SearchService():
     """
     Service class for handling search operations in cloud storage files.
@@ -22,28 +28,34 @@ class SearchService():
         self.search_provider = ElasticSearchService()
         self.known_files_path = self.settings.KNOWN_FILES_PATH
         self.download_folder = self.settings.DOWNLOAD_FOLDER
-        
-        # Ensure directories exist
-        os.makedirs(os.path.dirname(self.known_files_path), exist_ok=True)
-        os.makedirs(self.download_folder, exist_ok=True)
+        self._mkdir_cache: set = set()
+        self._index_checked = False
+        # Directories are created by Settings.validate() at first
+        # get_settings() call; no need to repeat the mkdir syscalls here.
+
+    def _ensure_dir(self, path: str):
+        """
+        Create a directory once and remember it, avoiding repeated
+        stat+mkdir syscalls on every save.
+        """
+        if path not in self._mkdir_cache:
+            os.makedirs(path, exist_ok=True)
+            self._mkdir_cache.add(path)
 
     def create_load_known_files(self) -> Dict:
         """
         Load known files from JSON file or create empty dict if file doesn't exist.
+
+        Timestamps stay as ISO8601 strings end to end; Elasticsearch date
+        fields accept them natively, so there is no per-entry
+        datetime round-trip on load or save.
         """
         try:
             if os.path.exists(self.known_files_path):
-                with open(self.known_files_path, "r") as f:
-                    known_files = json.load(f)
-                    for file_id, file_info in known_files.items():
-                        if isinstance(file_info, dict):
-                            if "last_modified" in file_info:
-                                try:
-                                    file_info["last_modified"] = datetime.fromisoformat(file_info["last_modified"])
-                                except (ValueError, TypeError) as e:
-                                    logger.warning(f"Failed to parse last_modified for {file_id}: {e}")
-                    logger.info(f"Successfully loaded {len(known_files)} known files")
-                    return known_files
+                with open(self.known_files_path, "rb") as f:
+                    known_files = orjson.loads(f.read())
+                logger.info(f"Successfully loaded {len(known_files)} known files")
+                return known_files
             else:
                 logger.info("No existing known_files.json found, starting with empty dictionary")
                 return {}
@@ -54,67 +66,56 @@ class SearchService():
     def save_known_files(self, known_files: Dict):
         """
         Save known files information to JSON file.
-    
+
+        The file is written once per crawl, atomically: the payload is
+        serialized to a temporary file which is then os.replace'd over
+        the real path, so readers never observe a half-written file.
         """
         try:
-            # Convert datetime objects to ISO format strings
-            serializable_files = {}
-            for file_id, file_info in known_files.items():
-                if isinstance(file_info, dict):
-                    serializable_files[file_id] = file_info.copy()
-                    if "last_modified" in serializable_files[file_id]:
-                        if isinstance(serializable_files[file_id]["last_modified"], datetime):
-                            serializable_files[file_id]["last_modified"] = file_info["last_modified"].isoformat()
-                else:
-                    # Handle case where file_info is a string or other type
-                    serializable_files[file_id] = file_info
-            
             # Ensure the directory exists
-            os.makedirs(os.path.dirname(self.known_files_path), exist_ok=True)
-            
-            with open(self.known_files_path, "w") as f:
-                json.dump(serializable_files, f, indent=2)
-                logger.info(f"Successfully saved {len(serializable_files)} known files")
+            self._ensure_dir(os.path.dirname(self.known_files_path))
+
+            # orjson serializes datetime values natively, so no per-entry
+            # copy; the catalog is machine-consumed, so it's only
+            # pretty-printed when debugging
+            option = orjson.OPT_INDENT_2 if self.settings.DEBUG else 0
+            tmp_path = f"{self.known_files_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(known_files, option=option))
+            os.replace(tmp_path, self.known_files_path)
+            logger.info(f"Successfully saved {len(known_files)} known files")
         except Exception as e:
             logger.error(f"Error saving known files: {e}")
             raise
 
     async def ensure_index_exists(self):
         """
-        Ensure the Elasticsearch index exists with proper mapping.
+        Ensure the live Elasticsearch index exists with proper mapping.
+
+        Delegates to the search provider, which owns the index name and
+        mapping. Memoized after the first successful check so the
+        per-request search path never pays the indices.exists
+        round-trip; normally invoked once from the lifespan startup
+        handler.
         """
-        try:
-            if not await self.search_provider.client.indices.exists(index="files"):
-                # Create index with mapping
-                await self.search_provider.client.indices.create(
-                    index="files",
-                    body={
-                        "mappings": {
-                            "properties": {
-                                "path": {"type": "keyword"},
-                                "content": {"type": "text"},
-                                "provider": {"type": "keyword"},
-                                "extension": {"type": "keyword"},
-                                "last_modified": {"type": "date"}
-                            }
-                        }
-                    }
-                )
-                logger.info("Created 'files' index with mapping")
-        except Exception as e:
-            logger.error(f"Error ensuring index exists: {e}")
-            raise
+        if self._index_checked:
+            return
+        await self.search_provider.ensure_index_exists()
+        self._index_checked = True
 
-    async def search_files(self, query: str) -> Dict[str, Any]:
+    async def refresh_from_storage(self):
         """
-        Search for files containing the query text.
-        if use_cache = True -> use local storage cache 
+        Bring the search index up to date with cloud storage.
+        if use_cache = True -> use local storage cache
         if use_cache = False -> fetch files from cloud and index directly
         """
         try:
+            if not self._index_checked:
+                # Safety net; normally done once at startup
+                await self.ensure_index_exists()
+
             if self.settings.USE_CACHE:
                 #with local storage cache
-                await self.ensure_index_exists()
                 storage_service = get_storage_service(provider=self.settings.STORAGE_PROVIDER)
                 known_files = self.create_load_known_files()
                 await storage_service.fetch_and_index_files(known_files)
@@ -122,30 +123,127 @@ class SearchService():
                 await self.update_index()
             else:
                 # without local storage cache
-                await self.ensure_index_exists()
                 storage_service = get_storage_service(provider=self.settings.STORAGE_PROVIDER)
                 files = await storage_service.list_files()
-                for file_info in files:
-                    try:
-                        content = await storage_service.get_file_content(file_info['path'])
+                if not files:
+                    return
+
+                # Overlap the per-file downloads instead of one RTT at a
+                # time, and stream fetched documents to the bulk through
+                # a bounded queue so only about a chunk's worth of
+                # content is ever resident: a fetcher blocked on the
+                # full queue holds its semaphore slot, pausing further
+                # downloads until the bulk consumer catches up.
+                sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+                queue = asyncio.Queue(maxsize=MAX_CONCURRENT_FETCHES)
+
+                async def fetch_one(file_info):
+                    async with sem:
+                        try:
+                            content = await storage_service.get_file_content(file_info['path'])
+                        except Exception as e:
+                            logger.warning(f"Failed to fetch file {file_info['path']}: {e}")
+                            return
                         if content:
-                            await self.search_provider.index_file(
-                                path=file_info['path'],
-                                content=content,
-                                provider=self.settings.STORAGE_PROVIDER,
-                                extension=os.path.splitext(file_info['path'])[1],
-                                last_modified=file_info.get('last_modified', datetime.now())
-                            )
-                    except Exception as e:
-                        logger.warning(f"Failed to index file {file_info['path']}: {e}")
-                        continue
-
-            return await self.search_provider.search_files(query)
-            
+                            await queue.put(self._index_action(file_info, content))
+
+                async def produce():
+                    await asyncio.gather(*(fetch_one(f) for f in files), return_exceptions=True)
+                    # Sentinel: all fetches have completed
+                    await queue.put(None)
+
+                producer = asyncio.create_task(produce())
+
+                async def actions():
+                    while True:
+                        action = await queue.get()
+                        if action is None:
+                            break
+                        yield action
+
+                try:
+                    await self._bulk_index(actions())
+                finally:
+                    # If the bulk died mid-stream the producer may be
+                    # blocked on a full queue; don't leave it dangling
+                    if not producer.done():
+                        producer.cancel()
+                    await asyncio.gather(producer, return_exceptions=True)
+
         except Exception as e:
-            logger.error(f"Search failed: {str(e)}")
+            logger.error(f"Index refresh failed: {str(e)}")
             raise Exception(f"Search operation failed: {str(e)}")
 
+    async def search_files(self, query: str) -> Dict[str, Any]:
+        """
+        Search for files containing the query text.
+        """
+        await self.refresh_from_storage()
+        return await self.search_provider.search_files(query)
+
+    async def iter_paths(self, query: str):
+        """
+        Stream the full paths of matching files one at a time.
+
+        The caller is expected to have refreshed the index already; this
+        just pages through the scan results without materializing them.
+        """
+        async for path in self.search_provider.iter_matching_paths(query):
+            yield path
+
+    def _index_action(self, file_info: Dict[str, Any], content) -> Dict[str, Any]:
+        """
+        Build one bulk index action for a file fetched from cloud storage.
+        """
+        path = file_info['path']
+        if isinstance(content, bytes):
+            size = len(content)
+            content = content.decode('utf-8', errors='ignore')
+        else:
+            size = len(content.encode('utf-8'))
+        last_modified = file_info.get('last_modified', datetime.now())
+        if isinstance(last_modified, datetime):
+            last_modified = last_modified.isoformat()
+        extension = os.path.splitext(path)[1]
+        return {
+            "_index": self.search_provider.index_name,
+            "_id": f"{self.settings.STORAGE_PROVIDER}:{path}",
+            # Shard-route by extension so bulk chunks group per shard
+            "_routing": extension or "other",
+            "_source": {
+                "file_path": path,
+                "provider": self.settings.STORAGE_PROVIDER,
+                "content": content,
+                "extension": extension,
+                "last_modified": last_modified,
+                "size": size
+            }
+        }
+
+    async def _bulk_index(self, actions):
+        """
+        Index a stream of bulk actions with a single bulk request.
+
+        The index refresh interval is suspended for the duration of the
+        bulk so Elasticsearch doesn't cut a new segment per chunk, then
+        restored afterwards.
+        """
+        client = self.search_provider.client
+        index = self.search_provider.index_name
+        await client.indices.put_settings(index=index, body={"index": {"refresh_interval": "-1"}})
+        try:
+            await async_bulk(
+                client,
+                actions,
+                chunk_size=self.settings.ELASTICSEARCH_CHUNK_SIZE,
+                max_chunk_bytes=self.settings.ELASTICSEARCH_MAX_CHUNK_BYTES
+            )
+        finally:
+            await client.indices.put_settings(
+                index=index,
+                body={"index": {"refresh_interval": self.settings.ELASTICSEARCH_REFRESH_INTERVAL}}
+            )
+
     async def update_index(self):
         """
         Update the search index with latest files from the local folder.
@@ -162,6 +260,8 @@ class SearchService():
 
         """
         await self.search_provider.close()
+        if storage.s_service is not None:
+            await storage.s_service.close()
 
 
 _search_service = None
@@ -1,14 +1,28 @@
 from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import asyncio
 import logging
 import os
 import json
+import random
+import aiofiles
+import aiofiles.os
+import aiohttp
 import dropbox
 from dropbox.files import FileMetadata
 from ..core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Upper bounds for concurrent Dropbox downloads and rate-limit retries
+MAX_CONCURRENT_DOWNLOADS = 10
+MAX_DOWNLOAD_RETRIES = 5
+
+# Streaming download endpoint and chunk size
+DROPBOX_CONTENT_DOWNLOAD_URL = "https://content.dropboxapi.com/2/files/download"
+DOWNLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+
 class CloudStorageService():
     """
     Base class for cloud storage services.
@@ -23,8 +37,29 @@ class CloudStorageService():
         self.settings = get_settings()
         self.download_folder = self.settings.DOWNLOAD_FOLDER
         self.known_files_path = self.settings.KNOWN_FILES_PATH
+        self._local_base = str(self.download_folder).rstrip("/") + "/"
+        self._mkdir_cache: set = set()
         logger.info(f"Initializing storage service for provider: {provider}")
 
+    def _local_path(self, path: str) -> str:
+        """
+        Map a cloud path onto the local cache folder.
+
+        Cloud paths always start with "/", so a slice onto the
+        precomputed base avoids the per-file lstrip scan and
+        os.path.join separator logic.
+        """
+        return self._local_base + (path[1:] if path.startswith("/") else path)
+
+    def _ensure_dir(self, path: str):
+        """
+        Create a directory once and remember it, so hot paths skip the
+        stat+mkdir syscalls on directories already known to exist.
+        """
+        if path not in self._mkdir_cache:
+            os.makedirs(path, exist_ok=True)
+            self._mkdir_cache.add(path)
+
 class DropBoxStorage(CloudStorageService):
     """
     Dropbox implementation of the cloud storage service.
@@ -41,6 +76,36 @@ class DropBoxStorage(CloudStorageService):
         else:
             self.client = dropbox.Dropbox(self.settings.DROPBOX_ACCESS_TOKEN)
             logger.info("Initialized Dropbox client")
+        # Copy hot-path settings into attributes once
+        self._access_token = self.settings.DROPBOX_ACCESS_TOKEN
+        self._debug = self.settings.DEBUG
+        self._download_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        self._executor = ThreadPoolExecutor(max_workers=16)
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared aiohttp session, creating it lazily so the
+        connection pool is reused across downloads.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self):
+        """
+        Close the shared HTTP session.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Dropbox HTTP session closed")
+
+    async def _call(self, fn, *args):
+        """
+        Run a blocking Dropbox SDK call on the thread pool so it does not
+        stall the event loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
 
     async def list_files(self) -> List[dict]:
         """
@@ -51,7 +116,7 @@ class DropBoxStorage(CloudStorageService):
             return []
             
         try:
-            result = self.client.files_list_folder('', recursive=True)
+            result = await self._call(self.client.files_list_folder, '', True)
             files = []
 
             while True:
@@ -63,7 +128,7 @@ class DropBoxStorage(CloudStorageService):
                         })
 
                 if result.has_more:
-                    result = self.client.files_list_folder_continue(result.cursor)
+                    result = await self._call(self.client.files_list_folder_continue, result.cursor)
                 else:
                     break
 
@@ -83,7 +148,7 @@ class DropBoxStorage(CloudStorageService):
             return None
             
         try:
-            metadata, res = self.client.files_download(path)
+            metadata, res = await self._call(self.client.files_download, path)
             return res.content
         except Exception as e:
             logger.error(f"Error getting file content for {path}: {str(e)}")
@@ -98,9 +163,10 @@ class DropBoxStorage(CloudStorageService):
             return
             
         try:
-            result = self.client.files_list_folder('', recursive=True)
+            result = await self._call(self.client.files_list_folder, '', True)
             current_files = set()
             downloaded_files = set()  # Track files we've already downloaded in this session
+            download_tasks = []
 
             while True:
                 for entry in result.entries:
@@ -114,51 +180,109 @@ class DropBoxStorage(CloudStorageService):
                             logger.debug(f"Skipping already downloaded file: {path}")
                             continue
 
-                        if path not in known_files or known_files[path] < last_modified.isoformat():
+                        if self._file_changed(known_files.get(path), entry, last_modified):
                             logger.info(f"New or updated file detected: {path}")
-                            try:
-                                await self.download_file(path, last_modified)
-                                downloaded_files.add(path)  # Mark as downloaded
-                                known_files[path] = last_modified.isoformat()
-                            except Exception as e:
-                                logger.error(f"Failed to download file {path}: {str(e)}")
-                                continue
+                            downloaded_files.add(path)  # Mark as downloaded
+                            download_tasks.append(asyncio.create_task(
+                                self._guarded_download(path, last_modified, entry.content_hash, known_files)
+                            ))
                         else:
                             logger.debug(f"No changes detected for: {path}")
 
                 if result.has_more:
-                    result = self.client.files_list_folder_continue(result.cursor)
+                    result = await self._call(self.client.files_list_folder_continue, result.cursor)
                 else:
                     break
 
-            # Handle removed files
-            removed_files = set(known_files.keys()) - current_files
-            for deleted_path in removed_files:
-                logger.info(f"File deleted from cloud, removing: {deleted_path}")
-        
-                #local cache path
-                local_path = os.path.join(self.download_folder, deleted_path.lstrip("/"))
-        
-                # Delete from local cache if it exists
-                if os.path.exists(local_path):
-                    os.remove(local_path)
-                    logger.info(f"Deleted local file: {local_path}")
-        
-                # Remove from known_files
-                del known_files[deleted_path]
+            # Overlap the per-file downloads instead of awaiting them one by one
+            if download_tasks:
+                await asyncio.gather(*download_tasks, return_exceptions=True)
 
-            # Save updated known_files to JSON
-            os.makedirs(os.path.dirname(self.known_files_path), exist_ok=True)
-            with open(self.known_files_path, "w") as f:
-                json.dump(known_files, f, indent=2)
+            # Handle removed files (dict keys view diff is computed in C)
+            removed_files = known_files.keys() - frozenset(current_files)
+            if removed_files:
+                await asyncio.gather(*[
+                    self._remove_local_copy(deleted_path) for deleted_path in removed_files
+                ])
+                for deleted_path in removed_files:
+                    # Remove from known_files
+                    del known_files[deleted_path]
 
         except Exception as e:
             logger.error(f"Error in fetch_and_index_files: {str(e)}")
             raise
 
+    async def _remove_local_copy(self, deleted_path: str):
+        """
+        Delete the local cache copy of a file removed from the cloud.
+
+        Uses the aiofiles.os wrappers so the exists/remove syscalls run on
+        the thread pool instead of blocking the event loop.
+        """
+        logger.info(f"File deleted from cloud, removing: {deleted_path}")
+
+        #local cache path
+        local_path = self._local_path(deleted_path)
+
+        # Delete from local cache if it exists
+        if await aiofiles.os.path.exists(local_path):
+            await aiofiles.os.remove(local_path)
+            logger.info(f"Deleted local file: {local_path}")
+
+    def _file_changed(self, known, entry: FileMetadata, last_modified: datetime) -> bool:
+        """
+        Decide whether a cloud entry needs downloading.
+
+        Prefers the Dropbox content_hash when the catalog has one (a
+        touched-but-identical file is skipped); legacy string entries
+        fall back to the modification-time comparison.
+        """
+        if known is None:
+            return True
+        if isinstance(known, dict):
+            known_hash = known.get("content_hash")
+            if known_hash:
+                return known_hash != entry.content_hash
+            known = known.get("last_modified")
+        return known < last_modified.isoformat()
+
+    async def _guarded_download(self, path: str, last_modified: datetime, content_hash, known_files):
+        """
+        Download a single file under the concurrency semaphore.
+
+        Retries on Dropbox rate limiting, honouring the server's backoff
+        hint with added jitter; marks the file in known_files only after
+        a successful download.
+        """
+        async with self._download_semaphore:
+            for attempt in range(MAX_DOWNLOAD_RETRIES):
+                try:
+                    await self.download_file(path, last_modified)
+                    known_files[path] = {
+                        "last_modified": last_modified.isoformat(),
+                        "content_hash": content_hash
+                    }
+                    return
+                except aiohttp.ClientResponseError as e:
+                    if e.status != 429:
+                        logger.error(f"Failed to download file {path}: {str(e)}")
+                        return
+                    retry_after = e.headers.get("Retry-After") if e.headers else None
+                    delay = (float(retry_after) if retry_after else 2 ** attempt) + random.uniform(0, 1)
+                    logger.warning(f"Rate limited downloading {path}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                except Exception as e:
+                    logger.error(f"Failed to download file {path}: {str(e)}")
+                    return
+            logger.error(f"Giving up on {path} after {MAX_DOWNLOAD_RETRIES} rate-limit retries")
+
     async def download_file(self, path: str, last_modified: datetime):
         """
         Download a file from Dropbox to local storage.
+
+        The response body is streamed in chunks through aiofiles, so peak
+        memory stays bounded by the chunk size and the event loop is never
+        blocked on disk writes.
         """
         if not self.client:
             logger.error("Cannot download file")
@@ -166,22 +290,30 @@ class DropBoxStorage(CloudStorageService):
             
         try:
             logger.info(f"Starting download of file: {path}")
-            metadata, res = self.client.files_download(path)
-            content = res.content
-            local_path = os.path.join(self.download_folder, path.lstrip("/"))
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            
-            #write to local cache
-            with open(local_path, "wb") as f:
-                f.write(content)
+            local_path = self._local_path(path)
+            self._ensure_dir(os.path.dirname(local_path))
+
+            headers = {
+                "Authorization": f"Bearer {self._access_token}",
+                "Dropbox-API-Arg": json.dumps({"path": path}),
+            }
+            session = self._get_session()
+
+            #stream straight to the local cache, one chunk at a time
+            async with session.post(DROPBOX_CONTENT_DOWNLOAD_URL, headers=headers) as res:
+                res.raise_for_status()
+                async with aiofiles.open(local_path, "wb") as f:
+                    async for chunk in res.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
             logger.info(f"Successfully saved file to: {local_path}")
-            
-            # Verify file was written correctly
-            if os.path.exists(local_path):
-                file_size = os.path.getsize(local_path)
-                logger.info(f"Verified file size: {file_size} bytes")
-            else:
-                logger.error(f"File was not written correctly: {local_path}")
+
+            # Verify file was written correctly (stat per download only while debugging)
+            if self._debug:
+                if os.path.exists(local_path):
+                    file_size = os.path.getsize(local_path)
+                    logger.info(f"Verified file size: {file_size} bytes")
+                else:
+                    logger.error(f"File was not written correctly: {local_path}")
             
         except Exception as e:
             logger.error(f"Error downloading file {path}: {str(e)}")
@@ -195,6 +327,8 @@ def get_storage_service(provider: str) -> CloudStorageService:
     """
     global s_service
     logger.debug(f"Getting storage service for provider: {provider}")
+    if s_service is not None and s_service.provider == provider:
+        return s_service
     if provider == "dropbox":
         s_service = DropBoxStorage()
     else:
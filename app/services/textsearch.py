@@ -1,22 +1,97 @@
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 from pydantic import BaseModel, Field, validator
 from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk, async_scan
 from elastic_transport import Transport
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
 import os
 import aiofiles
 import logging
 import fitz 
 import csv
+import threading
 from functools import wraps
 from ..core.config import get_settings
 from ..core.constants import FileExtension
 from .ocr import get_ocr_service
+from .cache import TextCache
 
 from ..models.searchResponse import Full_path_SearchResponse
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for concurrent text extractions during a reindex
+MAX_CONCURRENT_EXTRACTIONS = 8
+
+# Bump to invalidate cached extraction output after extractor changes
+EXTRACT_CACHE_VERSION = 1
+
+
+# Minimal extraction flags: plain text with mediabox clipping, no
+# ligature/whitespace reconstruction work we would throw away anyway
+PDF_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+
+def _extract_pdf_sync(file_path: str) -> str:
+    """
+    Extract text from a PDF file with PyMuPDF.
+
+    Runs inside a worker process, so it must stay a module-level
+    picklable function.
+    """
+    # Append page text to a list and join once: += on a string recopies
+    # the whole accumulated buffer per page, which goes quadratic on
+    # large documents. "text" mode skips layout reconstruction.
+    parts = []
+    with fitz.open(file_path) as pdf:
+        for page in pdf:
+            parts.append(page.get_text("text", flags=PDF_TEXT_FLAGS))
+    return "".join(parts)
+
+
+def _extract_pdf_pdfium_sync(file_path: str) -> str:
+    """
+    Extract text from a PDF file with pypdfium2 (PDFium).
+
+    Alternate backend for large corpora, selected via PDF_BACKEND=pdfium;
+    pypdfium2 must be installed separately.
+    """
+    import pypdfium2 as pdfium
+
+    parts = []
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for page in pdf:
+            textpage = page.get_textpage()
+            parts.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    return "".join(parts)
+
+
+def _extract_csv_sync(file_path: str) -> str:
+    """
+    Extract text from a CSV file, one space-joined line per row.
+
+    Runs inside a worker process, so it must stay a module-level
+    picklable function.
+    """
+    # csv.reader already yields lists of str, so join rows directly:
+    # the per-cell str() call and generator used to dominate on wide
+    # files. newline='' lets the C reader handle line endings itself,
+    # and the 1MB buffer cuts read syscalls on large CSVs.
+    text = []
+    with open(file_path, 'r', encoding='utf-8', errors='ignore',
+              newline='', buffering=1 << 20) as csvfile:
+        for row in csv.reader(csvfile):
+            text.append(' '.join(row))
+    return '\n'.join(text)
+
+
 class Textsearch:
     """
     Base class for text search functionality.
@@ -40,18 +115,43 @@ class ElasticSearchService(Textsearch):
         Initialize the Elasticsearch service.
         """
         super().__init__('elasticsearch')
+        # gzip the request bodies (bulk payloads are text-heavy and
+        # compress 5-10x) and size the per-node connection pool so
+        # concurrent bulk chunks are not serialized on one socket
         self.client = AsyncElasticsearch(
             hosts=[self.settings.ELASTICSEARCH_HOST],
             basic_auth=(self.settings.ELASTICSEARCH_USER, self.settings.ELASTICSEARCH_PASSWORD) if self.settings.ELASTICSEARCH_USER else None,
-            verify_certs=self.settings.ELASTICSEARCH_VERIFY_CERTS
+            verify_certs=self.settings.ELASTICSEARCH_VERIFY_CERTS,
+            http_compress=True,
+            connections_per_node=self.settings.ELASTICSEARCH_THREAD_COUNT,
+            request_timeout=60,
+            retry_on_timeout=True,
+            max_retries=3
         )
         self.index_name = self.settings.ELASTICSEARCH_INDEX
         self.downloads_folder = self.settings.DOWNLOAD_FOLDER
+        # PDF/CSV parsing is CPU-bound; run it across cores
+        self._extract_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        # Extraction results keyed by file identity + stat fingerprint, so
+        # incremental crawls skip re-parsing unchanged files entirely
+        self._extract_cache = TextCache(self.settings.OCR_CACHE_PATH, table="extract")
+        # Hot-loop copies: the crawl checks these once per file
+        self._ext_set = self.settings.SUPPORTED_FORMATS
+        self._max_size = self.settings.MAX_FILE_SIZE
         logger.info("Elasticsearch service initialized successfully")
 
-    async def index_file(self, path: str, content: str, provider: str, extension: str, last_modified: datetime):
+    async def index_file(self, path: str, content: str, provider: str, extension: str, last_modified: datetime, refresh=False, size=None):
         """
         Index a file in Elasticsearch.
+
+        refresh defaults to False so each document does not force its
+        own segment flush; the index refresh interval makes it
+        searchable shortly after. Callers that must read the document
+        back immediately can pass refresh="wait_for".
+
+        size is the on-disk byte size when the caller already has it
+        (e.g. from a stat); otherwise the character count of the content
+        is stored.
         """
         try:
             doc_id = f"{provider}:{path}"
@@ -66,14 +166,19 @@ class ElasticSearchService(Textsearch):
                 "content": content,
                 "extension": extension,
                 "last_modified": last_modified.isoformat(),
-                "size": len(content.encode('utf-8')) if isinstance(content, str) else len(content)
+                # Re-encoding content to UTF-8 just to count bytes would
+                # double peak memory for large documents
+                "size": size if size is not None else len(content)
             }
             
+            # Route by extension so documents of a kind land on the same
+            # shard; searches omit routing and fan out to all shards.
             await self.client.index(
                 index=self.index_name,
                 id=doc_id,
                 document=doc,
-                refresh=True
+                routing=extension or "other",
+                refresh=refresh
             )
             logger.info(f"Indexed file: {doc_id}")
             
@@ -81,17 +186,23 @@ class ElasticSearchService(Textsearch):
             logger.error(f"Error indexing file {path}: {str(e)}")
             raise Exception(f"Failed to index file: {str(e)}")
 
-    def _create_index(self):
+    async def ensure_index_exists(self):
         """
-        Create the Elasticsearch index if it doesn't exist.
+        Create the Elasticsearch index with its mapping if missing.
+
+        Must run before any bulk path: _prepare_for_bulk and the mget
+        diff call put_settings/mget on the index by name, which raises
+        index_not_found_exception instead of auto-creating the way a
+        plain document write would.
         """
         try:
-            if not self.client.indices.exists(index=self.index_name):
+            if not await self.client.indices.exists(index=self.index_name):
                 mapping = {
                     "mappings": {
                         "properties": {
                             "file_path": {"type": "keyword"},
                             "provider": {"type": "keyword"},
+                            "extension": {"type": "keyword"},
                             "content": {
                                 "type": "text",
                                 "analyzer": "standard",
@@ -103,14 +214,22 @@ class ElasticSearchService(Textsearch):
                         }
                     },
                     "settings": {
-                        "number_of_shards": 1,
+                        "number_of_shards": self.settings.ELASTICSEARCH_SHARDS,
                         "number_of_replicas": 0,
                         "index": {
-                            "refresh_interval": "1s"
+                            "refresh_interval": self.settings.ELASTICSEARCH_REFRESH_INTERVAL,
+                            # Batch translog fsyncs instead of syncing per
+                            # request; a crash can lose up to sync_interval
+                            # of in-flight docs, which a re-crawl restores
+                            "translog": {
+                                "durability": self.settings.ELASTICSEARCH_TRANSLOG_DURABILITY,
+                                "sync_interval": "30s",
+                                "flush_threshold_size": "1gb"
+                            }
                         }
                     }
                 }
-                self.client.indices.create(index=self.index_name, body=mapping)
+                await self.client.indices.create(index=self.index_name, body=mapping)
                 logger.info(f"Created Elasticsearch index: {self.index_name}")
         except Exception as e:
             logger.error(f"Error creating Elasticsearch index: {e}")
@@ -131,34 +250,80 @@ class ElasticSearchService(Textsearch):
         """
         Check if file type is supported for indexing.
         """
-        ext = os.path.splitext(file_path)[1].lower().lstrip('.')
+        ext = os.path.splitext(file_path)[1].lower()
         return ext in self.settings.SUPPORTED_FORMATS
 
-    async def extract_text_from_file(self, file_path: str) -> str:
+    def _validate(self, file_path: str, stat: os.stat_result = None):
+        """
+        Validate size and type with a single stat call.
+
+        Returns (ok, stat, ext) so callers in the crawl loop can reuse
+        the stat result for last_modified/size instead of statting the
+        same file again.
+        """
+        try:
+            if stat is None:
+                stat = os.stat(file_path)
+        except OSError as e:
+            logger.error(f"Error checking file size for {file_path}: {e}")
+            return False, None, ""
+        ext = os.path.splitext(file_path)[1].lower()
+        return stat.st_size <= self._max_size and ext in self._ext_set, stat, ext
+
+    def _extract_cache_key(self, file_path: str, ext: str) -> str:
+        """
+        Build the extraction cache key for a file.
+
+        (st_size, st_mtime_ns) is a cheap change fingerprint that avoids
+        hashing file content; the version tag and the active PDF backend
+        invalidate entries when the extractors themselves change.
+        """
+        st = os.stat(file_path)
+        backend = self.settings.PDF_BACKEND if ext == FileExtension.PDF else ""
+        return f"{file_path}:{st.st_size}:{st.st_mtime_ns}:{backend}:v{EXTRACT_CACHE_VERSION}"
+
+    async def extract_text_from_file(self, file_path: str, ext: str = None) -> str:
         """
         Extract text content from various file formats.
 
         Supported formats = PDF, TXT , CSV , PNG
+
+        Callers that already validated the file (the crawl loop) pass
+        ext to skip revalidation; without it the file is validated here.
+        Results are served from the on-disk extraction cache when the
+        file is unchanged since the last crawl.
         """
-        if not self.validate_file_size(file_path):
-            raise Exception(f"File {file_path} exceeds maximum size limit")
+        if ext is None:
+            ok, _, ext = self._validate(file_path)
+            if not ok:
+                raise Exception(f"File {file_path} exceeds maximum size limit or has unsupported type")
 
-        if not self.validate_file_type(file_path):
-            raise Exception(f"Unsupported file type for {file_path}")
+        # SQLite lookups and their commits fsync; keep them off the
+        # event loop like every other blocking call in this path
+        loop = asyncio.get_running_loop()
+        cache_key = self._extract_cache_key(file_path, ext)
+        cached = await loop.run_in_executor(None, self._extract_cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"Extraction cache hit for {file_path}")
+            return cached
 
-        ext = os.path.splitext(file_path)[1].lower()
         logger.info(f"Extracting text from {file_path} (type: {ext})")
         
         try:
             
             if ext == FileExtension.PDF:
-                text = ""
                 try:
-                    with fitz.open(file_path) as pdf:
-                        for page in pdf:
-                            text += page.get_text()
+                    extract_pdf = (
+                        _extract_pdf_pdfium_sync
+                        if self.settings.PDF_BACKEND == "pdfium"
+                        else _extract_pdf_sync
+                    )
+                    text = await asyncio.get_running_loop().run_in_executor(
+                        self._extract_pool, extract_pdf, file_path
+                    )
                     if not text.strip():
                         logger.warning(f"No text extracted from PDF: {file_path}")
+                    await loop.run_in_executor(None, self._extract_cache.set, cache_key, text)
                     return text
                 except Exception as e:
                     logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
@@ -166,7 +331,9 @@ class ElasticSearchService(Textsearch):
             
             elif ext == FileExtension.TXT:
                 async with aiofiles.open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return await f.read()
+                    text = await f.read()
+                await loop.run_in_executor(None, self._extract_cache.set, cache_key, text)
+                return text
                 
             elif ext == FileExtension.PNG:
                 try:
@@ -177,6 +344,7 @@ class ElasticSearchService(Textsearch):
                         logger.warning(f"No text extracted from image: {file_path}")
                     else:
                         logger.info(f"Successfully extracted {len(text)} characters from image")
+                    await loop.run_in_executor(None, self._extract_cache.set, cache_key, text)
                     return text
                 except Exception as e:
                     logger.error(f"Error extracting text from image {file_path}: {str(e)}")
@@ -184,12 +352,11 @@ class ElasticSearchService(Textsearch):
             
             elif ext == FileExtension.CSV:
                 try:
-                    text = []
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as csvfile:
-                        reader = csv.reader(csvfile)
-                        for row in reader:
-                            text.append(' '.join(str(cell) for cell in row))
-                    return '\n'.join(text)
+                    text = await asyncio.get_running_loop().run_in_executor(
+                        self._extract_pool, _extract_csv_sync, file_path
+                    )
+                    await loop.run_in_executor(None, self._extract_cache.set, cache_key, text)
+                    return text
                 except Exception as e:
                     logger.error(f"Error extracting text from CSV file {file_path}: {str(e)}")
                     raise Exception(f"Failed to extract from CSV file: {str(e)}")
@@ -201,24 +368,73 @@ class ElasticSearchService(Textsearch):
             logger.error(f"Failed to extract text from {file_path}: {e}")
             raise Exception(f"Text extraction failed: {str(e)}")
 
+    @staticmethod
+    def _typed_clauses(query: str):
+        """
+        Build clauses for queries that parse as a number or a date.
+
+        Numeric and date fields cannot be matched as text; a query like
+        "4096" or "2024-01-15" gets an exact clause against the typed
+        field instead, with date-only queries widened to the whole day.
+        """
+        clauses = []
+        try:
+            clauses.append({"term": {"size": int(query)}})
+        except ValueError:
+            try:
+                moment = datetime.fromisoformat(query)
+            except ValueError:
+                pass
+            else:
+                if "T" in query or " " in query:
+                    clauses.append({"term": {"last_modified": moment.isoformat()}})
+                else:
+                    clauses.append({"range": {"last_modified": {
+                        "gte": moment.isoformat(),
+                        "lt": (moment + timedelta(days=1)).isoformat()
+                    }}})
+        return clauses
+
+    def _build_query(self, query: str) -> Dict[str, Any]:
+        """
+        Build the query clause shared by search_files and
+        iter_matching_paths.
+
+        A single best_fields multi_match scores all text fields in one
+        clause. When the query also parses as a number or date, the
+        typed clauses join it as alternatives (any one may match), so
+        "4096" finds files of that size as well as files mentioning it.
+        """
+        text_clause = {
+            "multi_match": {
+                "query": query,
+                "fields": [
+                    "content",
+                    "file_path",
+                    "provider",
+                    "extension"
+                ],
+                "operator": "and",
+                "type": "best_fields"
+            }
+        }
+        typed = self._typed_clauses(query)
+        if typed:
+            return {
+                "bool": {
+                    "should": [text_clause] + typed,
+                    "minimum_should_match": 1
+                }
+            }
+        return {"bool": {"must": text_clause}}
+
     async def search_files(self, query: str) -> Full_path_SearchResponse:
         """
         Search for text in indexed files.
         """
         try:
             search_body = {
-                "query": {
-                    "multi_match": {
-                        "query": query,
-                        "fields": [
-                        "content",
-                        "file_path",
-                        "provider",
-                        "extension"
-                    ],
-                        "operator": "and"
-                }
-                },
+                "query": self._build_query(query),
                 "highlight": {
                     "fields": {
                         "content": {
@@ -265,93 +481,268 @@ class ElasticSearchService(Textsearch):
             logger.error(f"Error searching files: {str(e)}")
             raise Exception(f"Search operation failed: {str(e)}")
 
+    async def iter_matching_paths(self, query: str):
+        """
+        Stream the full paths of files matching the query, one hit at a
+        time, using the scan helper so large result sets never have to be
+        materialized in memory.
+        """
+        try:
+            async for hit in async_scan(
+                self.client,
+                index=self.index_name,
+                query={"query": self._build_query(query)},
+                _source=["file_path", "provider"]
+            ):
+                source = hit["_source"]
+                file_path = source["file_path"]
+                yield f"{source['provider'][0].upper()}../{os.path.basename(file_path)}"
+        except Exception as e:
+            logger.error(f"Error streaming search results: {str(e)}")
+            raise
+
     async def _delete_missing_from_index(self, current_files: set):
         """
-        Delete index of documents that no longer exist in cloud storage.
-        
+        Yield bulk delete actions for indexed documents that no longer
+        exist in cloud storage.
+
+        Enumerates the index with the scan helper, so cleanup covers the
+        whole corpus instead of stopping at the first page of results.
         """
         try:
-            response = await self.client.search(
+            async for hit in async_scan(
+                self.client,
                 index=self.index_name,
-                body={
-                    "query": {"match_all": {}},
-                    "size": 1000,
-                    "_source": ["file_path", "provider"]
-                }
-            )
-            
-            for hit in response["hits"]["hits"]:
+                query={"query": {"match_all": {}}},
+                _source=["file_path", "provider"],
+                size=1000
+            ):
                 file_path = hit["_source"]["file_path"]
                 provider = hit["_source"].get("provider", self.provider)
                 doc_id = f"{provider}:{file_path}"
-                
+
                 if doc_id not in current_files:
-                    try:
-                        await self.client.delete(index=self.index_name,id=doc_id,refresh=True)                        
-                        logger.info(f"Delete file from index: {file_path}")
-    
-                    except Exception as e:
-                        logger.error(f"Error deleting {file_path}: {str(e)}")
-        
+                    logger.info(f"Deleting file from index: {file_path}")
+                    action = {
+                        "_op_type": "delete",
+                        "_index": self.index_name,
+                        "_id": doc_id
+                    }
+                    # Deletes must target the shard the document was
+                    # routed to at index time
+                    routing = hit.get("_routing")
+                    if routing is not None:
+                        action["_routing"] = routing
+                    yield action
+
         except Exception as e:
             logger.error(f"Error cleaning up index: {str(e)}")
             raise Exception(f"Failed to clean up index: {str(e)}")
 
+    async def _drop_unchanged(self, candidates):
+        """
+        Filter out candidates whose indexed document already matches the
+        local file's mtime and size.
+
+        Looks the whole batch up with a single mget; if the lookup fails
+        (index missing, node down) every candidate is kept and the run
+        degrades to a full reindex.
+        """
+        if not candidates:
+            return candidates
+        try:
+            # Documents are indexed with extension routing, so the lookup
+            # must carry the same routing or it would miss on a
+            # multi-shard index
+            response = await self.client.mget(
+                index=self.index_name,
+                docs=[
+                    {"_id": file_id, "routing": ext or "other"}
+                    for _, _, file_id, _, ext in candidates
+                ],
+                source_includes=["last_modified", "size"]
+            )
+            indexed = {
+                doc["_id"]: doc["_source"]
+                for doc in response["docs"]
+                if doc.get("found")
+            }
+        except Exception as e:
+            logger.warning(f"Could not fetch indexed metadata, reindexing everything: {e}")
+            return candidates
+
+        changed = []
+        for candidate in candidates:
+            source = indexed.get(candidate[2])
+            if source is not None:
+                stat = candidate[3]
+                if (source.get("size") == stat.st_size and
+                        source.get("last_modified") == datetime.fromtimestamp(stat.st_mtime).isoformat()):
+                    continue
+            changed.append(candidate)
+        logger.info(f"{len(candidates) - len(changed)} of {len(candidates)} files unchanged since last index")
+        return changed
+
+    def _iter_files(self, root):
+        """
+        Yield DirEntry objects for every regular file under root.
+
+        scandir-based replacement for os.walk: DirEntry carries the file
+        type from the directory listing and caches its stat result, so
+        filtering and metadata collection avoid extra stat syscalls.
+        """
+        stack = [str(root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+            except OSError as e:
+                logger.error(f"Error scanning directory: {e}")
+
+    async def _prepare_for_bulk(self):
+        """
+        Suspend refresh and replication on the index while a bulk load
+        runs, so Elasticsearch doesn't flush segments per chunk.
+        """
+        await self.client.indices.put_settings(
+            index=self.index_name,
+            body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}}
+        )
+
+    async def _finish_bulk(self):
+        """
+        Restore steady-state index settings after a bulk load and merge
+        the freshly written segments down.
+        """
+        await self.client.indices.put_settings(
+            index=self.index_name,
+            body={"index": {"refresh_interval": self.settings.ELASTICSEARCH_REFRESH_INTERVAL, "number_of_replicas": 0}}
+        )
+        await self.client.indices.forcemerge(index=self.index_name, max_num_segments=1)
+
     async def update_index_from_local_folder(self):
         """
         Update Elasticsearch index from local folder.
+
+        All index and delete operations are streamed through a single
+        async_bulk call, amortizing HTTP overhead across the batch, and
+        the index is refreshed once at the end instead of per document.
         """
         try:
             current_files = set()
             storage_provider = self.provider
-            
-            for root, dirs, files in os.walk(self.downloads_folder):
-                for file in files:
-                    local_path = os.path.join(root, file)
-                    
+
+            # First pass: walk the folder and collect indexable candidates
+            candidates = []
+            for entry in self._iter_files(self.downloads_folder):
+                # Extension check on the name alone: skipping unsupported
+                # files costs no syscall at all
+                ext = os.path.splitext(entry.name)[1].lower()
+                if ext not in self._ext_set:
+                    logger.warning(f"Skipping {entry.path}: Unsupported file type")
+                    continue
+
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_size > self._max_size:
+                    logger.warning(f"Skipping {entry.path}: File too large")
+                    continue
+
+                local_path = entry.path
+                rel_path = os.path.relpath(local_path, self.downloads_folder)
+                file_id = f"{storage_provider}:{rel_path}"
+                current_files.add(file_id)
+                candidates.append((local_path, rel_path, file_id, stat, ext))
+
+            # Diff against what is already indexed: one mget for all ids,
+            # then drop candidates whose stored last_modified/size still
+            # match the local stat. Incremental runs only ship changes.
+            candidates = await self._drop_unchanged(candidates)
+
+            # Second pass: extract text across cores, a bounded number of
+            # files in flight at a time. Completed documents flow to the
+            # bulk through a bounded queue, so only about a chunk's worth
+            # of extracted text is ever resident instead of the whole
+            # corpus: a producer blocked on a full queue holds its
+            # semaphore slot, which also pauses further extraction until
+            # the bulk consumer catches up.
+            sem = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+            queue = asyncio.Queue(maxsize=MAX_CONCURRENT_EXTRACTIONS)
+
+            async def extract_one(local_path, rel_path, file_id, stat, ext):
+                async with sem:
                     try:
-                        if not self.validate_file_size(local_path):
-                            logger.warning(f"Skipping {local_path}: File too large")
-                            continue
-                            
-                        if not self.validate_file_type(local_path):
-                            logger.warning(f"Skipping {local_path}: Unsupported file type")
-                            continue
-                        
-                        rel_path = os.path.relpath(local_path, self.downloads_folder)
-                        file_id = f"{storage_provider}:{rel_path}"
-                        current_files.add(file_id)
-
-                        content = await self.extract_text_from_file(local_path)
-                        if not content or not content.strip():
-                            logger.warning(f"No content extracted from {local_path}")
-                            continue
-
-                        stat = os.stat(local_path)
-                        
-                        doc = {
-                            "file_path": rel_path,
-                            "provider": storage_provider,
-                            "content": content,
-                            "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                            "size": stat.st_size,
-                        }
-                        logger.info(f"Indexing document for {rel_path} with content length: {len(content)}")
-                        
-                        await self.client.index(
-                            index=self.index_name,
-                            id=file_id,
-                            document=doc,
-                            refresh=True
-                        )
-                        logger.info(f"Indexed file: {file_id}")
-                        
+                        content = await self.extract_text_from_file(local_path, ext=ext)
                     except Exception as e:
                         logger.error(f"Error processing file {local_path}: {str(e)}")
-                        continue
+                        return
+                    if not content or not content.strip():
+                        logger.warning(f"No content extracted from {local_path}")
+                        return
+
+                    doc = {
+                        "file_path": rel_path,
+                        "provider": storage_provider,
+                        "content": content,
+                        "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                        "size": stat.st_size,
+                    }
+                    logger.info(f"Indexing document for {rel_path} with content length: {len(content)}")
+
+                    await queue.put({
+                        "_op_type": "index",
+                        "_index": self.index_name,
+                        "_id": file_id,
+                        "_routing": ext or "other",
+                        "_source": doc
+                    })
+
+            async def produce():
+                await asyncio.gather(*(extract_one(*c) for c in candidates))
+                # Sentinel: all extractions have completed
+                await queue.put(None)
+
+            producer = asyncio.create_task(produce())
+
+            async def actions():
+                while True:
+                    action = await queue.get()
+                    if action is None:
+                        break
+                    yield action
+
+                # current_files is complete here, so stale deletions can
+                # ride in the same bulk stream
+                async for action in self._delete_missing_from_index(current_files):
+                    yield action
+
+            await self._prepare_for_bulk()
+            try:
+                success, errors = await async_bulk(
+                    self.client,
+                    actions(),
+                    chunk_size=self.settings.ELASTICSEARCH_CHUNK_SIZE,
+                    max_chunk_bytes=self.settings.ELASTICSEARCH_MAX_CHUNK_BYTES,
+                    request_timeout=60,
+                    raise_on_error=False
+                )
+            finally:
+                # If the bulk died mid-stream the producer may be blocked
+                # on a full queue; don't leave it dangling
+                if not producer.done():
+                    producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+                await self._finish_bulk()
+            if errors:
+                logger.error(f"Bulk indexing reported {len(errors)} failed actions: {errors[:3]}")
+            logger.info(f"Bulk indexing completed: {success} actions")
+
+            # Single refresh for the whole batch
+            await self.client.indices.refresh(index=self.index_name)
 
-            await self._delete_missing_from_index(current_files)
-            
         except Exception as e:
             logger.error(f"Error updating index: {str(e)}")
             raise Exception(f"Failed to update index: {str(e)}")
@@ -361,6 +752,7 @@ class ElasticSearchService(Textsearch):
         Close the Elasticsearch client connection.
         """
         try:
+            self._extract_cache.close()
             await self.client.close()
             logger.info("Elasticsearch client connection closed")
         except Exception as e:
@@ -368,15 +760,22 @@ class ElasticSearchService(Textsearch):
 
 
 _es_service = None
+_es_service_lock = threading.Lock()
 
 def get_elasticsearch_service() -> ElasticSearchService:
     """
     Get or create a singleton instance of ElasticSearchService.
-    
+
+    Creation is guarded by a lock so concurrent first calls cannot race
+    and each open their own AsyncElasticsearch connection pool, leaking
+    one of them. The unlocked fast path keeps steady-state calls cheap.
+
     Returns:
         ElasticSearchService: The singleton instance of the Elasticsearch service
     """
     global _es_service
     if _es_service is None:
-        _es_service = ElasticSearchService()
+        with _es_service_lock:
+            if _es_service is None:
+                _es_service = ElasticSearchService()
     return _es_service 
\ No newline at end of file
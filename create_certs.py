@@ -1,12 +1,25 @@
 #!/usr/bin/env python3
 import os
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from OpenSSL import crypto
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _generate_rsa_key_pem(bits):
+    """
+    Generate an RSA key and return it as PEM bytes.
+
+    Runs in a worker process; PKey objects don't pickle, so the key
+    travels back as PEM and is loaded again in the parent.
+    """
+    key = crypto.PKey()
+    key.generate_key(crypto.TYPE_RSA, bits)
+    return crypto.dump_privatekey(crypto.FILETYPE_PEM, key)
+
+
 def create_self_signed_cert(certs_dir):
     """
     Creates a self-signed server certificate and a CA certificate.
@@ -15,9 +28,15 @@ def create_self_signed_cert(certs_dir):
     logger.info(f"Creating certificates in directory: {certs_dir}")
     os.makedirs(certs_dir, exist_ok=True)
 
+    # Key generation is CPU-bound and the two keys are independent;
+    # generate them on two cores instead of back to back
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        server_key_future = executor.submit(_generate_rsa_key_pem, 2048)
+        ca_key_future = executor.submit(_generate_rsa_key_pem, 2048)
+        server_key = crypto.load_privatekey(crypto.FILETYPE_PEM, server_key_future.result())
+        ca_key = crypto.load_privatekey(crypto.FILETYPE_PEM, ca_key_future.result())
+
     # === Server Key & Certificate ===
-    server_key = crypto.PKey()
-    server_key.generate_key(crypto.TYPE_RSA, 2048)
 
     server_cert = crypto.X509()
     subject = server_cert.get_subject()
@@ -51,9 +70,6 @@ def create_self_signed_cert(certs_dir):
     os.chmod(server_key_path, 0o600)
 
     # === CA Key & Certificate ===
-    ca_key = crypto.PKey()
-    ca_key.generate_key(crypto.TYPE_RSA, 2048)
-
     ca_cert = crypto.X509()
     ca_subject = ca_cert.get_subject()
     ca_subject.C = "US"